@@ -0,0 +1,63 @@
+import sys
+
+
+INDEXED_FIELDS = ["issuer", "network", "card_type", "tier"]
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [_intern(v) for v in value]
+    if isinstance(value, dict):
+        return {sys.intern(k): _intern(v) for k, v in value.items()}
+    return value
+
+
+class CardStore:
+    """
+    Single interned copy of the card master, shared by every tenant.
+
+    Cards are addressed by position; subsets of the catalog are plain
+    int bitmaps over those positions (bit i set = card i included).
+    Attribute indexes are built once here and reused by all tenants.
+    """
+
+    def __init__(self, cards: list, version: str = "unknown"):
+        self.version = version
+        self.cards = [_intern(c) for c in cards]
+        self.positions = {c["card_id"]: i for i, c in enumerate(self.cards)}
+        self.all_bits = (1 << len(self.cards)) - 1
+
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        for i, card in enumerate(self.cards):
+            for field in INDEXED_FIELDS:
+                value = card.get(field)
+                bucket = self.indexes[field]
+                bucket[value] = bucket.get(value, 0) | (1 << i)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def bitmap_for_ids(self, card_ids) -> int:
+        bits = 0
+        for card_id in card_ids:
+            if card_id not in self.positions:
+                raise KeyError(f"Unknown card_id: {card_id}")
+            bits |= 1 << self.positions[card_id]
+        return bits
+
+    def bitmap_where(self, field: str, values) -> int:
+        index = self.indexes[field]
+        bits = 0
+        for value in values:
+            bits |= index.get(value, 0)
+        return bits
+
+    def select(self, bits: int) -> list:
+        selected = []
+        while bits:
+            low = bits & -bits
+            selected.append(self.cards[low.bit_length() - 1])
+            bits ^= low
+        return selected
@@ -177,13 +177,18 @@ class CreditCardEngine:
     # -----------------------------
     # FILTERS
     # -----------------------------
+    def risk_penalty(self, user, card):
+        # Computed per request rather than stamped onto the card dict,
+        # since card dicts are shared across requests and tenants
+        if self._emi_ratio(user) > 0.30 and card["tier"] in ["premium", "super_premium"]:
+            return 10
+        return 0
+
     def apply_hard_filters(self, user, cards):
         filtered = []
-        emi_ratio = self._emi_ratio(user)
 
         for card in cards:
             allowed = True
-            card["_risk_penalty"] = 0
 
             if user["age_group"] == "18_24" and card["tier"] in ["premium", "super_premium"]:
                 allowed = False
@@ -194,9 +199,6 @@ class CreditCardEngine:
             if user.get("credit_score_range") == "below_650" and card["tier"] not in ["entry", "secured"]:
                 allowed = False
 
-            if emi_ratio > 0.30 and card["tier"] in ["premium", "super_premium"]:
-                card["_risk_penalty"] = 10
-
             if allowed:
                 filtered.append(card)
 
@@ -220,98 +222,257 @@ class CreditCardEngine:
     # -----------------------------
     # SCORING ENGINE
     # -----------------------------
-    def score_cards(self, user, cards):
-        scored = []
-        weights = self.rules["scoring_weights"]
-        emi_ratio = self._emi_ratio(user)
-
-        risk_profile = self.compute_full_risk_profile(user)
-
+    RULE_ORDER = [
+        "network_match",
+        "income_match",
+        "credit_score_match",
+        "goal_match",
+        "spend_category_match",
+        "low_emi_bonus"
+    ]
+
+    def goal_card_types(self, user):
         goal_types = []
         for g in user.get("primary_goal", []):
             goal_types.extend(self.rules["goal_card_type_map"].get(g, []))
+        return goal_types
 
-        for card in cards:
-            score = 0
-            matched_rules = []
+    def match_rules(self, user, card, goal_types, emi_ratio):
+        matched_rules = []
 
-            if card["network"] == user["preferred_network"]:
-                score += weights["network_match"]
-                matched_rules.append("network_match")
+        if card["network"] == user["preferred_network"]:
+            matched_rules.append("network_match")
 
-            if user["monthly_income"] >= card["min_income"]:
-                score += weights["income_match"]
-                matched_rules.append("income_match")
+        if user["monthly_income"] >= card["min_income"]:
+            matched_rules.append("income_match")
 
-            if user.get("credit_score_value", 700) >= card["min_credit_score"]:
-                score += weights["credit_score_match"]
-                matched_rules.append("credit_score_match")
+        if user.get("credit_score_value", 700) >= card["min_credit_score"]:
+            matched_rules.append("credit_score_match")
 
-            if card["card_type"] in goal_types:
-                score += weights["goal_match"]
-                matched_rules.append("goal_match")
+        if card["card_type"] in goal_types:
+            matched_rules.append("goal_match")
 
-            if user["top_spend_category"] in card.get("spend_bonus_category", []):
-                score += weights["spend_category_match"]
-                matched_rules.append("spend_category_match")
+        if user["top_spend_category"] in card.get("spend_bonus_category", []):
+            matched_rules.append("spend_category_match")
 
-            if emi_ratio < 0.3:
-                score += weights["low_emi_bonus"]
-                matched_rules.append("low_emi_bonus")
+        if emi_ratio < 0.3:
+            matched_rules.append("low_emi_bonus")
 
-            score -= card.get("_risk_penalty", 0)
+        return matched_rules
 
-            score += max(min(risk_profile["composite_score"] / 10, 12), -12)
+    @staticmethod
+    def risk_adjustment(risk_profile):
+        return max(min(risk_profile["composite_score"] / 10, 12), -12)
 
-            if score >= self.rules["minimum_score_to_show"]:
-                explanations = ExplainabilityEngine.generate(user, card, matched_rules)
+    def score_cards(self, user, cards, risk_profile=None, explain=True):
+        scored = []
+        weights = self.rules["scoring_weights"]
+        emi_ratio = self._emi_ratio(user)
+
+        if risk_profile is None:
+            risk_profile = self.compute_full_risk_profile(user)
+        goal_types = self.goal_card_types(user)
+
+        for card in cards:
+            matched_rules = self.match_rules(user, card, goal_types, emi_ratio)
+            score = sum(weights[r] for r in matched_rules)
+
+            score -= self.risk_penalty(user, card)
 
-                scored.append({
+            score += self.risk_adjustment(risk_profile)
+
+            if score >= self.rules["minimum_score_to_show"]:
+                entry = {
                     "card": card,
                     "score": round(score, 2),
-                    "why_this_card": explanations,
                     "risk_profile": risk_profile
-                })
+                }
+
+                if explain:
+                    entry["why_this_card"] = ExplainabilityEngine.generate(user, card, matched_rules)
+                else:
+                    entry["matched_rules"] = matched_rules
+
+                scored.append(entry)
 
         return sorted(scored, key=lambda x: x["score"], reverse=True)
 
     # -----------------------------
     # FINAL RECOMMENDATION
     # -----------------------------
-    def recommend(self, user, cards):
+    def _explain(self, user, entries):
+        # score_cards(explain=False) leaves matched_rules on each entry;
+        # only the cards actually returned get rendered
+        for entry in entries:
+            entry["why_this_card"] = ExplainabilityEngine.generate(
+                user, entry["card"], entry.pop("matched_rules")
+            )
+
+    @staticmethod
+    def _similarity(card, issuers, card_types, pairs):
+        if (card["issuer"], card["card_type"]) in pairs:
+            return 1.0
+        if card["issuer"] in issuers or card["card_type"] in card_types:
+            return 0.5
+        return 0.0
+
+    def select_diverse(self, ranked, k, max_rest=None):
+        """
+        Greedy top-k over `ranked` (already sorted by score, desc) under
+        RULES_CONFIG["diversity"]:
+          max_per_issuer / max_per_card_type — hard caps on the picks
+          similarity_penalty — MMR-style: each pick maximises
+            score - penalty * similarity to cards already picked
+            (1.0 same issuer and type, 0.5 either, 0 otherwise)
+
+        Since the penalty only lowers a score, a scan can stop as soon
+        as the next raw score cannot beat the best adjusted one, so the
+        cost grows with k rather than with the catalog.
+
+        Caps are hard: if they leave slots empty, fewer than k cards are
+        returned (recommend's fallback then fills within the caps).
+        Setting relax_caps_when_short tops the slots up from the capped
+        cards in rank order instead.
+
+        Returns (picked, rest); rest keeps rank order and is cut to
+        max_rest entries when given.
+        """
+        cfg = self.rules.get("diversity") or {}
+        max_issuer = cfg.get("max_per_issuer")
+        max_type = cfg.get("max_per_card_type")
+        penalty = cfg.get("similarity_penalty") or 0
+
+        if not (max_issuer or max_type or penalty):
+            rest = ranked[k:] if max_rest is None else ranked[k:k + max_rest]
+            return ranked[:k], rest
+
+        picked_at = []
+        skip = set()
+        capped = []
+        issuer_counts, type_counts = {}, {}
+        issuers, card_types, pairs = set(), set(), set()
+        start = 0
+
+        while len(picked_at) < k:
+            while start in skip:
+                start += 1
+
+            best, best_value = None, None
+            for i in range(start, len(ranked)):
+                if i in skip:
+                    continue
+
+                entry = ranked[i]
+                if best_value is not None and entry["score"] <= best_value:
+                    break
+
+                card = entry["card"]
+                if (
+                    (max_issuer and issuer_counts.get(card["issuer"], 0) >= max_issuer) or
+                    (max_type and type_counts.get(card["card_type"], 0) >= max_type)
+                ):
+                    # caps only tighten, so this card stays blocked
+                    skip.add(i)
+                    capped.append(i)
+                    continue
+
+                value = entry["score"] - penalty * self._similarity(card, issuers, card_types, pairs)
+                if best_value is None or value > best_value:
+                    best, best_value = i, value
+
+            if best is None:
+                break
+
+            card = ranked[best]["card"]
+            picked_at.append(best)
+            skip.add(best)
+            issuer_counts[card["issuer"]] = issuer_counts.get(card["issuer"], 0) + 1
+            type_counts[card["card_type"]] = type_counts.get(card["card_type"], 0) + 1
+            issuers.add(card["issuer"])
+            card_types.add(card["card_type"])
+            pairs.add((card["issuer"], card["card_type"]))
+
+        if cfg.get("relax_caps_when_short"):
+            for i in sorted(capped)[:k - len(picked_at)]:
+                picked_at.append(i)
+
+        chosen = set(picked_at)
+        rest = []
+        for i, entry in enumerate(ranked):
+            if max_rest is not None and len(rest) >= max_rest:
+                break
+            if i not in chosen:
+                rest.append(entry)
+
+        return [ranked[i] for i in picked_at], rest
+
+    def _breaks_caps(self, card, entries):
+        cfg = self.rules.get("diversity") or {}
+        if cfg.get("relax_caps_when_short"):
+            return False
+
+        max_issuer = cfg.get("max_per_issuer")
+        max_type = cfg.get("max_per_card_type")
+
+        if max_issuer and sum(e["card"]["issuer"] == card["issuer"] for e in entries) >= max_issuer:
+            return True
+        if max_type and sum(e["card"]["card_type"] == card["card_type"] for e in entries) >= max_type:
+            return True
+        return False
+
+    def recommend(self, user, cards, risk_profile=None, include_alternatives=True, include_primary=True):
         cards = self.apply_hard_filters(user, cards)
         cards = self.apply_network_filter(user, cards)
 
-        scored = self.score_cards(user, cards)
+        scored = self.score_cards(user, cards, risk_profile, explain=False)
+
+        top, alternatives = self.select_diverse(
+            scored,
+            self.rules["top_results"],
+            self.rules.get("max_alternatives") if include_alternatives else 0
+        )
+
+        if not include_primary:
+            # alternatives-only: primary, fallbacks and confidence never run
+            if include_alternatives:
+                self._explain(user, alternatives)
+            return {"alternatives": alternatives if include_alternatives else []}
+
+        self._explain(user, top)
 
         # fallback cards
-        if len(scored) < self.rules["top_results"]:
+        if len(top) < self.rules["top_results"]:
             fillers = sorted(cards, key=lambda c: c.get("min_income", 0))
             for c in fillers:
-                if len(scored) >= self.rules["top_results"]:
+                if len(top) >= self.rules["top_results"]:
                     break
 
+                if self._breaks_caps(c, top):
+                    continue
+
                 explanations = ExplainabilityEngine.generate(
                     user, c, ["alternative_option"]
                 )
 
-                scored.append({
+                top.append({
                     "card": c,
                     "score": 10,
                     "why_this_card": explanations
                 })
 
-        top = scored[:self.rules["top_results"]]
-        alternatives = scored[self.rules["top_results"]:]
-
         confidence = round(
             sum(1 for t in top if t["score"] >= 60) / len(top),
             2
         )
 
-        return {
+        result = {
             "eligible": True,
             "confidence_score": confidence,
-            "primary": top,
-            "alternatives": alternatives
+            "primary": top
         }
+
+        if include_alternatives:
+            self._explain(user, alternatives)
+            result["alternatives"] = alternatives
+
+        return result
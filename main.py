@@ -1,15 +1,18 @@
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict
 import json
+import time
 
-from orchestrator import Orchestrator
+from card_store import CardStore
+from orchestrator import SECTIONS
+from request_log import RequestLogger, build_record, catalog_version
+from tenants import TenantRegistry
+from tenants_config import TENANTS_CONFIG, DEFAULT_TENANT
 
 app = FastAPI(title="Neupi Analysis Engine")
 
-API_KEY = "NEUPI_API_KEY_2025_SECRET"
-
 # -----------------------------
 #  CORS
 # -----------------------------
@@ -41,7 +44,27 @@ def load_cards():
         print("❌ Failed to load cards_master.json:", e)
         return []
 
-CARDS = load_cards()
+CATALOG_VERSION = catalog_version("cards_master.json")
+
+# -----------------------------
+#  TENANTS (shared card store)
+# -----------------------------
+CARD_STORE = CardStore(load_cards(), CATALOG_VERSION)
+CARDS = CARD_STORE.cards
+TENANTS = TenantRegistry(CARD_STORE, TENANTS_CONFIG, DEFAULT_TENANT)
+
+# -----------------------------
+#  REQUEST / RESULT AUDIT LOG
+# -----------------------------
+REQUEST_LOG = RequestLogger()
+
+@app.on_event("startup")
+def start_request_log():
+    REQUEST_LOG.start()
+
+@app.on_event("shutdown")
+def stop_request_log():
+    REQUEST_LOG.stop()
 
 # -----------------------------
 #  USER INPUT MODEL (NEW SCHEMA)
@@ -99,24 +122,8 @@ def extract_top_spend(spend_profile: Dict[str, int]) -> str:
         return "online_shopping"
     return max(spend_profile, key=spend_profile.get)
 
-# -----------------------------
-#  ROUTES
-# -----------------------------
-@app.get("/")
-def root():
+def normalize_user(user: UserProfile) -> dict:
     return {
-        "status": "ok",
-        "cards_loaded": len(CARDS)
-    }
-
-@app.post("/analyze/profile")
-def analyze_profile(user: UserProfile, x_api_key: str = Header(None)):
-
-    # API key check (optional)
-    if x_api_key and x_api_key != API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid API key")
-
-    normalized_user = {
         "email": user.email,
 
         "age_group": user.age_group,
@@ -150,5 +157,60 @@ def analyze_profile(user: UserProfile, x_api_key: str = Header(None)):
         "annual_fee_comfort": fee_map.get(user.annual_fee_comfort, "medium")
     }
 
-    orchestrator = Orchestrator()
-    return orchestrator.analyze_with_cards(normalized_user, CARDS)
+def run_analysis(user: UserProfile, x_api_key: Optional[str], sections=None):
+    started = time.perf_counter()
+
+    # API key selects the tenant (optional — no key means default tenant)
+    tenant = TENANTS.resolve(x_api_key)
+    if tenant is None:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+
+    normalized_user = normalize_user(user)
+
+    try:
+        result = tenant.orchestrator.analyze_with_cards(normalized_user, tenant.cards, sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    REQUEST_LOG.log(build_record(
+        normalized_user,
+        result,
+        tenant.catalog_version,
+        (time.perf_counter() - started) * 1000,
+        tenant.tenant_id
+    ))
+
+    return result
+
+# -----------------------------
+#  ROUTES
+# -----------------------------
+@app.get("/")
+def root():
+    return {
+        "status": "ok",
+        "cards_loaded": len(CARDS),
+        "tenants": {
+            t.tenant_id: {"cards": len(t), "catalog_version": t.catalog_version}
+            for t in TENANTS.tenants.values()
+        },
+        "catalog_version": CATALOG_VERSION,
+        "request_log": REQUEST_LOG.stats()
+    }
+
+@app.post("/analyze/profile")
+def analyze_profile(
+    user: UserProfile,
+    x_api_key: str = Header(None),
+    sections: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(SECTIONS))
+):
+    requested = [s.strip() for s in sections.split(",") if s.strip()] if sections else None
+    return run_analysis(user, x_api_key, requested)
+
+@app.post("/analyze/health")
+def analyze_health(user: UserProfile, x_api_key: str = Header(None)):
+    return run_analysis(user, x_api_key, ["health"])
+
+@app.post("/analyze/cards")
+def analyze_cards(user: UserProfile, x_api_key: str = Header(None)):
+    return run_analysis(user, x_api_key, ["recommended_cards"])
@@ -2,9 +2,12 @@ from credit_card_engine import CreditCardEngine
 from rules_config import RULES_CONFIG
 
 
+SECTIONS = ("health", "risk_profile", "recommended_cards", "alternatives")
+
+
 class Orchestrator:
-    def __init__(self):
-        self.card_engine = CreditCardEngine(RULES_CONFIG)
+    def __init__(self, rules_config: dict = RULES_CONFIG):
+        self.card_engine = CreditCardEngine(rules_config)
 
     # -------------------------------------------------
     # BASE PROFILE (kept minimal — used by UI summary)
@@ -22,15 +25,18 @@ class Orchestrator:
     # -------------------------------------------------
     #  HEALTH SCORE ENGINE
     # -------------------------------------------------
-    def _build_health_score(self, user: dict) -> dict:
+    def _build_health_score(self, user: dict, risk_profile: dict = None) -> dict:
         """
         Derives a 0–100 Financial Health Score using the
         same risk signals used in recommendation logic.
         """
 
-        strength = self.card_engine.compute_user_strength(user)
-        behaviour = self.card_engine.compute_behaviour_risk(user)
-        bnpl = self.card_engine.compute_bnpl_risk(user)
+        if risk_profile is None:
+            risk_profile = self.card_engine.compute_full_risk_profile(user)
+
+        strength = risk_profile["strength"]
+        behaviour = risk_profile["behaviour"]
+        bnpl = risk_profile["bnpl"]
 
         # Weighted composite — tunable in RULES_CONFIG later
         score = (
@@ -76,26 +82,54 @@ class Orchestrator:
     # -------------------------------------------------
     #  MAIN PIPELINE
     # -------------------------------------------------
-    def analyze_with_cards(self, user: dict, cards: list) -> dict:
+    def analyze_with_cards(self, user: dict, cards: list, sections=None) -> dict:
+        """
+        Runs only the parts of the pipeline needed for `sections`
+        (default: all of SECTIONS). Intermediate results are computed
+        lazily and shared, so e.g. the risk profile is built once for
+        health, risk_profile and card scoring alike.
+        """
+        sections = set(SECTIONS if sections is None else sections)
+
+        unknown = sections - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+
+        cache = {}
+
+        def risk_profile():
+            if "risk" not in cache:
+                cache["risk"] = self.card_engine.compute_full_risk_profile(user)
+            return cache["risk"]
+
         profile = self.analyze_profile(user)
 
-        # 🔹 Compute full risk + health meta
-        health = self._build_health_score(user)
+        if "health" in sections:
+            health = self._build_health_score(user, risk_profile())
 
-        # 🔹 Card Recommendations (already risk-aware)
-        card_results = self.card_engine.recommend(user, cards)
+            profile["health_score"] = health["score"]
+            profile["health_band"] = health["band"]
+            profile["health_breakdown"] = health["breakdown"]
 
-        # Attach outputs
-        profile["health_score"] = health["score"]
-        profile["health_band"] = health["band"]
-        profile["health_breakdown"] = health["breakdown"]
+        if "risk_profile" in sections:
+            risk = risk_profile()
 
-        profile["risk_profile"] = {
-            "strength": health["breakdown"][0]["source"],
-            "behaviour": health["breakdown"][1]["source"],
-            "bnpl": health["breakdown"][2]["source"]
-        }
+            profile["risk_profile"] = {
+                "strength": risk["strength"],
+                "behaviour": risk["behaviour"],
+                "bnpl": risk["bnpl"]
+            }
 
-        profile["recommended_cards"] = card_results
+        if sections & {"recommended_cards", "alternatives"}:
+            # 🔹 Card Recommendations (already risk-aware)
+            card_results = self.card_engine.recommend(
+                user,
+                cards,
+                risk_profile=risk_profile(),
+                include_alternatives="alternatives" in sections,
+                include_primary="recommended_cards" in sections
+            )
+
+            profile["recommended_cards"] = card_results
 
         return profile
@@ -0,0 +1,252 @@
+import glob
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+LOG_CONFIG = {
+    "path": "logs/analysis_log.jsonl",
+    "queue_size": 10000,
+    "batch_size": 200,
+    "flush_interval_s": 2.0,
+    "max_file_bytes": 50 * 1024 * 1024,
+    "compress_rotated": True
+}
+
+# Secret for keyed email hashing; set in the environment, never in the repo
+EMAIL_HASH_KEY_ENV = "NEUPI_LOG_EMAIL_KEY"
+
+
+def hash_email(email, key=None):
+    """
+    HMAC-SHA256 of the normalized email. Deterministic for a given key,
+    so records can still be joined, but not reversible by hashing a list
+    of candidate addresses without the key. Without a key the email is
+    omitted rather than written in a guessable form.
+    """
+    if key is None:
+        key = os.environ.get(EMAIL_HASH_KEY_ENV)
+    if not email or not key:
+        return None
+    return hmac.new(
+        key.encode("utf-8"),
+        email.strip().lower().encode("utf-8"),
+        hashlib.sha256
+    ).hexdigest()
+
+
+def catalog_version(path: str) -> str:
+    """
+    Short content hash of the card master file. Tenants fold it into
+    their own catalog_version together with their catalog and rules.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return "unknown"
+
+
+class RequestLogger:
+    """
+    Non-blocking JSONL audit log.
+
+    Requests enqueue records into a bounded queue; a daemon thread
+    drains it in batches and appends them to disk, flushing when a
+    batch fills up or the flush interval elapses. When the queue is
+    full (slow disk), records are counted as dropped instead of
+    blocking the request path.
+    """
+
+    def __init__(self, config=None):
+        self.config = {**LOG_CONFIG, **(config or {})}
+        self.path = self.config["path"]
+
+        self._queue = queue.Queue(maxsize=self.config["queue_size"])
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._compressors = []
+
+        self.written = 0
+        self.dropped = 0
+
+    # -----------------------------
+    # LIFECYCLE
+    # -----------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._recover_rotated()
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="request-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+        # anything still unfinished here is picked up by the next start()
+        for t in self._compressors:
+            t.join(timeout)
+        self._compressors = []
+
+    def _recover_rotated(self):
+        """
+        Cleans up after a shutdown that interrupted compression: drops
+        partial *.gz.tmp files and re-compresses rotated files left raw.
+        """
+        for path in glob.glob(glob.escape(self.path) + ".*"):
+            if path.endswith(".gz.tmp"):
+                os.remove(path)
+            elif not path.endswith(".gz"):
+                if os.path.exists(path + ".gz"):
+                    # .gz is only ever renamed into place complete
+                    os.remove(path)
+                elif self.config["compress_rotated"]:
+                    self._start_compress(path)
+
+    # -----------------------------
+    # PRODUCER SIDE
+    # -----------------------------
+    def log(self, record: dict) -> bool:
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped
+        }
+
+    # -----------------------------
+    # WRITER THREAD
+    # -----------------------------
+    def _run(self):
+        batch = []
+        last_flush = time.monotonic()
+        interval = self.config["flush_interval_s"]
+
+        while not self._stop.is_set() or not self._queue.empty():
+            timeout = max(interval - (time.monotonic() - last_flush), 0.01)
+
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            due = time.monotonic() - last_flush >= interval
+            if batch and (len(batch) >= self.config["batch_size"] or due or self._stop.is_set()):
+                self._flush(batch)
+                batch = []
+                last_flush = time.monotonic()
+            elif due:
+                last_flush = time.monotonic()
+
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        lines = "".join(
+            json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch
+        )
+
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            with self._lock:
+                self.dropped += len(batch)
+            print("❌ Failed to write request log:", e)
+            return
+
+        self.written += len(batch)
+
+        # The batch is on disk; a rotation failure must not count it as dropped
+        try:
+            self._maybe_rotate()
+        except OSError as e:
+            print("❌ Failed to rotate request log:", e)
+
+    def _maybe_rotate(self):
+        if os.path.getsize(self.path) < self.config["max_file_bytes"]:
+            return
+
+        rotated = f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}.{suffix}"
+            suffix += 1
+
+        os.replace(self.path, rotated)
+
+        if self.config["compress_rotated"]:
+            self._start_compress(rotated)
+
+    def _start_compress(self, path):
+        # gzip of a full file takes seconds; doing it on the writer thread
+        # would stall draining and drop records, so it gets its own thread
+        self._compressors = [t for t in self._compressors if t.is_alive()]
+        t = threading.Thread(
+            target=self._compress, args=(path,),
+            name="request-log-compress", daemon=True
+        )
+        self._compressors.append(t)
+        t.start()
+
+    @staticmethod
+    def _compress(path):
+        try:
+            # write under a temp name so readers never see a partial .gz
+            with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(path + ".gz.tmp", path + ".gz")
+            os.remove(path)
+        except OSError as e:
+            print("❌ Failed to compress rotated request log:", e)
+
+
+def build_record(user: dict, result: dict, catalog: str, latency_ms: float, tenant: str = None) -> dict:
+    """
+    Shapes one analysis into an audit record. The email is replaced by
+    its keyed hash (see hash_email) before anything leaves the request path.
+    """
+    normalized = dict(user)
+    normalized["email"] = hash_email(user.get("email"))
+
+    cards = result.get("recommended_cards") or {}
+    primary = cards.get("primary", [])
+
+    return {
+        "ts": time.time(),
+        "tenant": tenant,
+        "catalog_version": catalog,
+        "input": normalized,
+        "top_card_ids": [p["card"]["card_id"] for p in primary],
+        "top_scores": [p["score"] for p in primary],
+        "confidence_score": cards.get("confidence_score"),
+        "health_score": result.get("health_score"),
+        "latency_ms": round(latency_ms, 2)
+    }
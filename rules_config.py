@@ -1,6 +1,13 @@
 RULES_CONFIG = {
     "minimum_score_to_show": 60,
     "top_results": 2,
+    "max_alternatives": None,
+    "diversity": {
+        "max_per_issuer": None,
+        "max_per_card_type": None,
+        "similarity_penalty": 0,
+        "relax_caps_when_short": False
+    },
     "scoring_weights": {
         "network_match": 20,
         "income_match": 20,
@@ -17,3 +24,17 @@ RULES_CONFIG = {
         "tax_saving": ["low_fee"]
     }
 }
+
+
+def merge_rules(base: dict, overrides: dict) -> dict:
+    """
+    Returns `base` with `overrides` applied; nested dicts such as
+    scoring_weights are merged key by key rather than replaced.
+    """
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merged[key] = {**base[key], **value}
+        else:
+            merged[key] = value
+    return merged
@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from card_store import CardStore
+from orchestrator import Orchestrator
+from rules_config import RULES_CONFIG, merge_rules
+
+
+CATALOG_FILTERS = {
+    "issuers": "issuer",
+    "card_types": "card_type"
+}
+
+
+class Tenant:
+    def __init__(self, tenant_id: str, store: CardStore, config: dict):
+        self.tenant_id = tenant_id
+        self.store = store
+
+        bits = store.all_bits
+        if config.get("card_ids") is not None:
+            bits &= store.bitmap_for_ids(config["card_ids"])
+        for key, field in CATALOG_FILTERS.items():
+            if config.get(key) is not None:
+                bits &= store.bitmap_where(field, config[key])
+        self.catalog_bits = bits
+
+        self.rules = merge_rules(RULES_CONFIG, config.get("rules_overrides", {}))
+        self.orchestrator = Orchestrator(self.rules)
+
+        # what this tenant's requests are actually scored on: master file
+        # version, catalog subset and merged rules
+        fingerprint = json.dumps(
+            {"master": store.version, "catalog": hex(bits), "rules": self.rules},
+            sort_keys=True
+        )
+        self.catalog_version = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+        # references into the shared store, in master order
+        self.cards = store.select(bits)
+
+    def __len__(self):
+        return len(self.cards)
+
+
+class TenantRegistry:
+    """
+    Resolves API keys to tenants. All tenants are built once at
+    startup over the same CardStore, so catalogs and indexes are
+    never duplicated per partner.
+    """
+
+    def __init__(self, store: CardStore, tenants_config: dict, default_tenant: str):
+        self.store = store
+        self.tenants = {
+            tenant_id: Tenant(tenant_id, store, cfg)
+            for tenant_id, cfg in tenants_config.items()
+        }
+        self.by_api_key = {
+            cfg["api_key"]: self.tenants[tenant_id]
+            for tenant_id, cfg in tenants_config.items()
+            if cfg.get("api_key")
+        }
+        self.default = self.tenants[default_tenant]
+
+    def resolve(self, api_key):
+        """
+        Returns the tenant for `api_key`, the default tenant when no
+        key is sent, or None for an unknown key.
+        """
+        if not api_key:
+            return self.default
+        return self.by_api_key.get(api_key)
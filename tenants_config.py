@@ -0,0 +1,14 @@
+DEFAULT_TENANT = "neupi"
+
+# Each tenant sees a subset of cards_master.json and may override
+# RULES_CONFIG. Catalog filters are optional and combine with AND:
+#   card_ids   — explicit allow-list
+#   issuers    — allowed issuer names
+#   card_types — allowed card_type values
+# rules_overrides is merged over RULES_CONFIG (nested dicts key by key).
+TENANTS_CONFIG = {
+    "neupi": {
+        "api_key": "NEUPI_API_KEY_2025_SECRET",
+        "rules_overrides": {}
+    }
+}
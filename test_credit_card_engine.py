@@ -0,0 +1,95 @@
+from credit_card_engine import CreditCardEngine
+from rules_config import RULES_CONFIG, merge_rules
+
+
+def _engine(**diversity):
+    return CreditCardEngine(merge_rules(RULES_CONFIG, {"diversity": diversity}))
+
+
+def _entry(card_id, issuer, card_type, score):
+    return {
+        "card": {"card_id": card_id, "issuer": issuer, "card_type": card_type},
+        "score": score
+    }
+
+
+RANKED = [
+    _entry("a1", "A", "cashback", 100),
+    _entry("a2", "A", "rewards", 95),
+    _entry("a3", "A", "travel", 90),
+    _entry("b1", "B", "cashback", 85),
+    _entry("c1", "C", "rewards", 80)
+]
+
+
+class RecordingList(list):
+    def __init__(self, items):
+        super().__init__(items)
+        self.accessed = set()
+
+    def __getitem__(self, i):
+        if isinstance(i, int):
+            self.accessed.add(i)
+        return super().__getitem__(i)
+
+
+def _ids(entries):
+    return [e["card"]["card_id"] for e in entries]
+
+
+def test_issuer_cap_holds_when_slots_go_unfilled():
+    picked, rest = _engine(max_per_issuer=1).select_diverse(RANKED, 6)
+
+    assert _ids(picked) == ["a1", "b1", "c1"]
+    assert _ids(rest) == ["a2", "a3"]
+
+
+def test_relax_caps_when_short_tops_up_in_rank_order():
+    picked, _ = _engine(max_per_issuer=1, relax_caps_when_short=True).select_diverse(RANKED, 4)
+
+    assert _ids(picked) == ["a1", "b1", "c1", "a2"]
+
+
+def test_recommend_fallback_respects_caps():
+    engine = _engine(max_per_issuer=1)
+    cards = [
+        {"card_id": f"a{i}", "issuer": "A", "card_type": "cashback", "network": "visa",
+         "tier": "entry", "min_income": 1000 * i, "min_credit_score": 900}
+        for i in range(3)
+    ] + [
+        {"card_id": "b0", "issuer": "B", "card_type": "rewards", "network": "visa",
+         "tier": "entry", "min_income": 5000, "min_credit_score": 900}
+    ]
+    user = {
+        "age_group": "25_34",
+        "employment_type": "salaried",
+        "monthly_income": 500,
+        "monthly_emi": 0,
+        "credit_score_value": 600,
+        "preferred_network": "no_preference",
+        "top_spend_category": "online"
+    }
+
+    result = engine.recommend(user, cards)
+
+    assert _ids(result["primary"]) == ["a0", "b0"]
+
+
+def test_mmr_scan_stops_once_raw_scores_cannot_win():
+    ranked = RecordingList(
+        [_entry("a1", "A", "cashback", 100), _entry("b1", "B", "rewards", 99)] +
+        [_entry(f"z{i}", "Z", "fuel", 50 - i) for i in range(50)]
+    )
+
+    picked, _ = _engine(similarity_penalty=10).select_diverse(ranked, 2, max_rest=0)
+
+    assert _ids(picked) == ["a1", "b1"]
+    # each pick stops at the first entry whose raw score <= best adjusted score
+    assert max(ranked.accessed) <= 2
+
+
+def test_mmr_penalty_prefers_dissimilar_card():
+    # a2: 95 - 40 * 0.5 = 75, b1: 85 - 20 = 65, c1: 80 - 0 = 80
+    picked, _ = _engine(similarity_penalty=40).select_diverse(RANKED, 2)
+
+    assert _ids(picked) == ["a1", "c1"]
@@ -0,0 +1,62 @@
+import json
+
+import explainability_engine
+from orchestrator import Orchestrator
+
+
+with open("cards_master.json", "r", encoding="utf-8") as f:
+    CARDS = json.load(f)
+
+USER = {
+    "email": None,
+    "age_group": "25_34",
+    "employment_type": "salaried",
+    "monthly_income": 250000,
+    "monthly_emi": 5000,
+    "credit_score_range": "750_plus",
+    "credit_score_value": 780,
+    "risk_appetite": "moderate",
+    "primary_goal": ["save_money", "earn_rewards"],
+    "preferred_network": "no_preference",
+    "top_spend_category": "online"
+}
+
+
+def _count_explanations(monkeypatch):
+    calls = []
+    original = explainability_engine.ExplainabilityEngine.generate
+
+    def counting(user, card, matched_rules):
+        calls.append(card["card_id"])
+        return original(user, card, matched_rules)
+
+    monkeypatch.setattr(explainability_engine.ExplainabilityEngine, "generate", staticmethod(counting))
+    return calls
+
+
+def test_health_only_skips_card_scoring(monkeypatch):
+    calls = _count_explanations(monkeypatch)
+    result = Orchestrator().analyze_with_cards(USER, CARDS, ["health"])
+
+    assert "health_score" in result
+    assert "recommended_cards" not in result
+    assert calls == []
+
+
+def test_alternatives_only_does_not_explain_primary(monkeypatch):
+    calls = _count_explanations(monkeypatch)
+    result = Orchestrator().analyze_with_cards(USER, CARDS, ["alternatives"])
+
+    alternatives = result["recommended_cards"]["alternatives"]
+    assert alternatives
+    assert set(result["recommended_cards"]) == {"alternatives"}
+    assert calls == [a["card"]["card_id"] for a in alternatives]
+
+
+def test_full_pipeline_entries_have_explanations_only():
+    result = Orchestrator().analyze_with_cards(USER, CARDS)
+    cards = result["recommended_cards"]
+
+    for entry in cards["primary"] + cards["alternatives"]:
+        assert "matched_rules" not in entry
+        assert all(isinstance(e, dict) for e in entry["why_this_card"])
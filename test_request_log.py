@@ -0,0 +1,67 @@
+import time
+
+from request_log import RequestLogger, hash_email
+
+
+def test_hash_email_is_keyed_and_deterministic():
+    a = hash_email("User@Example.com ", key="k1")
+    assert a == hash_email("user@example.com", key="k1")
+    assert a != hash_email("user@example.com", key="k2")
+
+
+def test_hash_email_without_key_omits_email(monkeypatch):
+    monkeypatch.delenv("NEUPI_LOG_EMAIL_KEY", raising=False)
+    assert hash_email("user@example.com") is None
+
+
+def test_rotation_failure_does_not_count_written_batch_as_dropped(tmp_path, monkeypatch):
+    logger = RequestLogger({"path": str(tmp_path / "log.jsonl"), "max_file_bytes": 1})
+
+    def fail():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(logger, "_maybe_rotate", fail)
+    logger._flush([{"a": 1}, {"a": 2}])
+
+    assert logger.written == 2
+    assert logger.dropped == 0
+
+
+def test_rotated_files_are_compressed(tmp_path):
+    logger = RequestLogger({"path": str(tmp_path / "log.jsonl"), "max_file_bytes": 1})
+    logger._flush([{"a": 1}])
+
+    for _ in range(50):
+        if list(tmp_path.glob("log.jsonl.*.gz")):
+            break
+        time.sleep(0.05)
+
+    assert len(list(tmp_path.glob("log.jsonl.*.gz"))) == 1
+    assert not (tmp_path / "log.jsonl").exists()
+
+
+def test_stop_waits_for_compression(tmp_path):
+    logger = RequestLogger({"path": str(tmp_path / "log.jsonl"), "max_file_bytes": 1})
+    logger._flush([{"a": 1}])
+    logger.stop()
+
+    assert len(list(tmp_path.glob("log.jsonl.*.gz"))) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_start_recovers_interrupted_compression(tmp_path):
+    raw = tmp_path / "log.jsonl.20260101-000000"
+    raw.write_text('{"a": 1}\n')
+    (tmp_path / "log.jsonl.20260101-000000.gz.tmp").write_bytes(b"partial")
+    done = tmp_path / "log.jsonl.20260101-000001"
+    done.write_text('{"a": 2}\n')
+    (tmp_path / "log.jsonl.20260101-000001.gz").write_bytes(b"")
+
+    logger = RequestLogger({"path": str(tmp_path / "log.jsonl")})
+    logger.start()
+    logger.stop()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "log.jsonl.20260101-000000.gz",
+        "log.jsonl.20260101-000001.gz"
+    ]
@@ -0,0 +1,39 @@
+import json
+
+from card_store import CardStore
+from tenants import TenantRegistry
+
+
+with open("cards_master.json", "r", encoding="utf-8") as f:
+    CARDS = json.load(f)
+
+TENANTS = {
+    "neupi": {"api_key": "k1"},
+    "same": {"api_key": "k2"},
+    "subset": {"api_key": "k3", "card_types": ["cashback"]},
+    "rules": {"api_key": "k4", "rules_overrides": {"scoring_weights": {"goal_match": 40}}}
+}
+
+
+def _versions(master_version):
+    registry = TenantRegistry(CardStore(CARDS, master_version), TENANTS, "neupi")
+    return {t.tenant_id: t.catalog_version for t in registry.tenants.values()}
+
+
+def test_catalog_version_tracks_master_catalog_and_rules():
+    v1 = _versions("v1")
+
+    assert v1["neupi"] == v1["same"]
+    assert v1["subset"] != v1["neupi"]
+    assert v1["rules"] != v1["neupi"]
+    assert _versions("v1") == v1
+    assert _versions("v2")["neupi"] != v1["neupi"]
+
+
+def test_resolve_by_api_key():
+    registry = TenantRegistry(CardStore(CARDS), TENANTS, "neupi")
+
+    assert registry.resolve(None).tenant_id == "neupi"
+    assert registry.resolve("k3").tenant_id == "subset"
+    assert registry.resolve("bad") is None
+    assert {c["card_type"] for c in registry.resolve("k3").cards} == {"cashback"}
@@ -0,0 +1,125 @@
+import gzip
+import json
+
+import pytest
+
+from card_store import CardStore
+from credit_card_engine import CreditCardEngine
+from request_log import RequestLogger
+from rules_config import RULES_CONFIG, merge_rules
+from tenants import TenantRegistry
+from weight_sweep import WeightSweep, expand_grid, load_profiles, main
+
+
+with open("cards_master.json", "r", encoding="utf-8") as f:
+    CARDS = json.load(f)
+
+USER = {
+    "age_group": "25_34",
+    "employment_type": "salaried",
+    "monthly_income": 60000,
+    "monthly_emi": 5000,
+    "credit_score_range": "750_plus",
+    "credit_score_value": 780,
+    "primary_goal": ["save_money"],
+    "preferred_network": "no_preference",
+    "top_spend_category": "online"
+}
+
+TENANTS = {
+    "neupi": {"api_key": "k1"},
+    "partner": {
+        "api_key": "k2",
+        "card_types": ["cashback"],
+        "rules_overrides": {"top_results": 1, "minimum_score_to_show": 40}
+    }
+}
+
+
+def test_load_profiles_filters_by_tenant(tmp_path):
+    log = tmp_path / "log.jsonl"
+    records = [
+        {"tenant": "neupi", "input": {**USER, "monthly_income": 1}},
+        {"tenant": "partner", "input": {**USER, "monthly_income": 2}},
+        {"input": {**USER, "monthly_income": 3}}
+    ]
+    log.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    partner = load_profiles(str(log), "partner")
+    default = load_profiles(str(log), "neupi")
+
+    assert [p["monthly_income"] for p in partner] == [2]
+    assert [p["monthly_income"] for p in default] == [1, 3]
+    assert len(load_profiles(str(log))) == 3
+
+
+def test_sweep_baseline_matches_tenant_recommendation():
+    tenant = TenantRegistry(CardStore(CARDS), TENANTS, "neupi").tenants["partner"]
+    sweep = WeightSweep([USER], tenant.cards, tenant.rules)
+
+    expected = CreditCardEngine(tenant.rules).recommend(USER, tenant.cards)
+    primary = [sweep.card_ids[i] for i in sweep.baseline[0][0] if i >= 0]
+
+    assert primary == [p["card"]["card_id"] for p in expected["primary"]]
+    assert set(primary) <= {c["card_id"] for c in tenant.cards}
+
+
+def test_load_profiles_reads_uncompressed_rotations_once(tmp_path):
+    logger = RequestLogger({"path": str(tmp_path / "log.jsonl"), "max_file_bytes": 1, "compress_rotated": False})
+    logger._flush([{"tenant": "neupi", "input": USER}])
+    logger._flush([{"tenant": "neupi", "input": USER}])
+
+    assert len(list(tmp_path.glob("log.jsonl.*"))) == 2
+    assert len(load_profiles(str(tmp_path / "log.jsonl"))) == 2
+
+    # an interrupted compression leaves raw + .gz.tmp, or raw + finished .gz
+    rotated = sorted(tmp_path.glob("log.jsonl.*"))
+    (tmp_path / (rotated[0].name + ".gz.tmp")).write_bytes(b"partial")
+    with open(rotated[1], "rb") as src, gzip.open(str(rotated[1]) + ".gz", "wb") as dst:
+        dst.write(src.read())
+
+    assert len(load_profiles(str(tmp_path / "log.jsonl"))) == 2
+
+
+def test_sweep_rejects_empty_traffic(tmp_path, capsys):
+    log = tmp_path / "log.jsonl"
+    log.write_text(json.dumps({"tenant": "neupi", "input": USER}) + "\n")
+    candidates = tmp_path / "candidates.json"
+    candidates.write_text("[{}]")
+
+    with pytest.raises(ValueError):
+        WeightSweep([], CARDS)
+
+    with pytest.raises(SystemExit):
+        main(["--log", str(tmp_path / "missing.jsonl"), "--candidates", str(candidates)])
+    assert "no recorded profiles" in capsys.readouterr().err
+
+
+def test_sweep_rejects_unsupported_candidate_keys():
+    with pytest.raises(ValueError):
+        expand_grid({"top_results": [1, 3]})
+
+    sweep = WeightSweep([USER], CARDS)
+    with pytest.raises(ValueError):
+        sweep.evaluate({"goal_card_type_map": {"travel": ["cashback"]}})
+    with pytest.raises(ValueError):
+        sweep.run([{"scoring_weights": {"unknown_rule": 5}}])
+
+
+def test_sweep_refuses_rules_with_diversity():
+    rules = merge_rules(RULES_CONFIG, {"diversity": {"max_per_issuer": 1}})
+
+    with pytest.raises(ValueError):
+        WeightSweep([USER], CARDS, rules)
+
+
+def test_load_profiles_filters_by_catalog_version(tmp_path):
+    log = tmp_path / "log.jsonl"
+    records = [
+        {"tenant": "neupi", "catalog_version": "old", "input": {**USER, "monthly_income": 1}},
+        {"tenant": "neupi", "catalog_version": "new", "input": {**USER, "monthly_income": 2}}
+    ]
+    log.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    assert [p["monthly_income"] for p in load_profiles(str(log), "neupi", "new")] == [2]
+    assert len(load_profiles(str(log), "neupi")) == 2
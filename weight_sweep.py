@@ -0,0 +1,365 @@
+"""
+Offline rule-weight sweep over recorded traffic.
+
+Loads a recorded profile log (the JSONL written by request_log.py,
+rotated files included, compressed or not) and the card catalog once, precomputes the
+per-(profile, card) rule-match tensor, and re-scores any number of
+candidate `scoring_weights` / `minimum_score_to_show` settings as
+matrix products against it.
+
+Only SWEEPABLE_KEYS may be varied; other overrides (top_results,
+goal_card_type_map, ...) change the precomputed tensor and are rejected.
+Rankings are replayed by raw score, so tenants whose rules enable
+RULES_CONFIG["diversity"] caps or penalty are refused.
+
+Each run replays a single tenant (--tenant, default DEFAULT_TENANT):
+only that tenant's records are loaded, and they are scored against its
+catalog and rules, with candidates applied on top of those rules.
+Records whose catalog_version differs from the tenant's current one
+were scored on another catalog or rule set and are skipped unless
+--any-version is given.
+
+Usage:
+    python weight_sweep.py --log logs/analysis_log.jsonl \\
+        --candidates candidates.json --tenant neupi --out sweep_report.json
+
+`candidates.json` is either a list of partial rule configs, e.g.
+    [{"scoring_weights": {"goal_match": 30}, "minimum_score_to_show": 55}]
+or a grid whose leaves are lists of values to combine:
+    {"scoring_weights": {"goal_match": [10, 20, 30]},
+     "minimum_score_to_show": [50, 60]}
+"""
+
+import argparse
+import glob
+import gzip
+import itertools
+import json
+
+import numpy as np
+
+from credit_card_engine import CreditCardEngine
+from card_store import CardStore
+from request_log import catalog_version
+from rules_config import RULES_CONFIG, merge_rules
+from tenants import TenantRegistry
+from tenants_config import TENANTS_CONFIG, DEFAULT_TENANT
+
+
+# Mirrors the "score >= 60" confidence cut in CreditCardEngine.recommend
+CONFIDENCE_SCORE_CUT = 60
+
+SWEEPABLE_KEYS = {"scoring_weights", "minimum_score_to_show"}
+
+
+# -----------------------------
+# INPUT LOADING
+# -----------------------------
+def _open_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def log_files(pattern: str) -> list:
+    """
+    The live log plus every rotated file (<path>.<stamp>[.<n>][.gz]).
+    Partial *.gz.tmp files are skipped, and a raw rotated file whose
+    .gz also exists is read only once, from the .gz.
+    """
+    files = set(glob.glob(pattern))
+    files.update(p for p in glob.glob(pattern + ".*") if not p.endswith(".gz.tmp"))
+    return sorted(p for p in files if p + ".gz" not in files)
+
+
+def load_profiles(pattern: str, tenant: str = None, catalog_version: str = None) -> list:
+    """
+    Reads normalized profiles from every log file matching `pattern`.
+    Audit records carry the profile under "input"; bare profile dicts
+    are accepted as well. With `tenant`, only that tenant's records are
+    kept; records without a tenant (bare dicts, or logged before tenants
+    existed) belong to DEFAULT_TENANT. With `catalog_version`, only
+    records scored on that tenant fingerprint are kept.
+    """
+    profiles = []
+
+    for path in log_files(pattern):
+        with _open_log(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if tenant is not None and (record.get("tenant") or DEFAULT_TENANT) != tenant:
+                    continue
+                if catalog_version is not None and record.get("catalog_version") != catalog_version:
+                    continue
+                profiles.append(record.get("input", record))
+
+    return profiles
+
+
+def validate_candidate(candidate: dict):
+    unsupported = set(candidate) - SWEEPABLE_KEYS
+    if unsupported:
+        raise ValueError(
+            f"Candidate overrides {', '.join(sorted(unsupported))}; "
+            f"only {', '.join(sorted(SWEEPABLE_KEYS))} can be swept"
+        )
+
+    unknown = set(candidate.get("scoring_weights", {})) - set(CreditCardEngine.RULE_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown scoring weights: {', '.join(sorted(unknown))}")
+
+
+def expand_grid(grid: dict) -> list:
+    """
+    Turns {"scoring_weights": {rule: [..]}, "minimum_score_to_show": [..]}
+    into the list of partial rule configs it describes.
+    """
+    axes = []
+    for key, value in grid.items():
+        if isinstance(value, dict):
+            for sub, options in value.items():
+                axes.append(((key, sub), options))
+        else:
+            axes.append(((key, None), value))
+
+    candidates = []
+    for combo in itertools.product(*(options for _, options in axes)):
+        candidate = {}
+        for ((key, sub), _), choice in zip(axes, combo):
+            if sub is None:
+                candidate[key] = choice
+            else:
+                candidate.setdefault(key, {})[sub] = choice
+        validate_candidate(candidate)
+        candidates.append(candidate)
+
+    return candidates
+
+
+# -----------------------------
+# SWEEP ENGINE
+# -----------------------------
+class WeightSweep:
+    def __init__(self, profiles: list, cards: list, rules_config: dict = RULES_CONFIG):
+        if not profiles:
+            raise ValueError("No recorded profiles to replay")
+
+        diversity = rules_config.get("diversity") or {}
+        if any(diversity.get(k) for k in ("max_per_issuer", "max_per_card_type", "similarity_penalty")):
+            raise ValueError(
+                "Rules enable diversity selection, which the sweep does not replay; "
+                "churn would be measured against a baseline the tenant does not serve"
+            )
+
+        self.rules = rules_config
+        self.engine = CreditCardEngine(rules_config)
+        self.rule_names = CreditCardEngine.RULE_ORDER
+        self.top_n = rules_config["top_results"]
+
+        self.cards = list(cards)
+        self.card_ids = np.array([c["card_id"] for c in self.cards])
+
+        self._precompute(profiles)
+        self.baseline = self._rank(*self._weight_vector(rules_config))
+
+    def _precompute(self, profiles):
+        P, C, R = len(profiles), len(self.cards), len(self.rule_names)
+        rule_index = {r: i for i, r in enumerate(self.rule_names)}
+        card_index = {id(c): i for i, c in enumerate(self.cards)}
+
+        matches = np.zeros((P, C, R), dtype=np.float32)
+        eligible = np.zeros((P, C), dtype=bool)
+        penalty = np.zeros((P, C), dtype=np.float32)
+        adjust = np.zeros(P, dtype=np.float32)
+        fillers = np.full((P, self.top_n), -1, dtype=np.int32)
+
+        for p, user in enumerate(profiles):
+            allowed = self.engine.apply_hard_filters(user, self.cards)
+            allowed = self.engine.apply_network_filter(user, allowed)
+
+            emi_ratio = self.engine._emi_ratio(user)
+            goal_types = self.engine.goal_card_types(user)
+            adjust[p] = self.engine.risk_adjustment(
+                self.engine.compute_full_risk_profile(user)
+            )
+
+            for card in allowed:
+                c = card_index[id(card)]
+                eligible[p, c] = True
+                penalty[p, c] = self.engine.risk_penalty(user, card)
+                for rule in self.engine.match_rules(user, card, goal_types, emi_ratio):
+                    matches[p, c, rule_index[rule]] = 1
+
+            by_income = sorted(allowed, key=lambda c: c.get("min_income", 0))
+            for j, card in enumerate(by_income[:self.top_n]):
+                fillers[p, j] = card_index[id(card)]
+
+        self.n_profiles = P
+        self.matches = matches.reshape(P * C, R)
+        self.eligible = eligible
+        self.n_eligible = eligible.sum(axis=1)
+        self.offset = adjust[:, None] - penalty
+        self.fillers = fillers
+
+    def _weight_vector(self, rules: dict):
+        weights = rules["scoring_weights"]
+        vector = np.array([weights[r] for r in self.rule_names], dtype=np.float32)
+        return vector, rules["minimum_score_to_show"]
+
+    def _rank(self, weights, min_score, base=None):
+        """
+        Replays CreditCardEngine.recommend for every profile at once:
+        returns the primary card indices (-1 for empty slots), the
+        number of cards that cleared the threshold, and the confidence.
+        """
+        P, N = self.n_profiles, self.top_n
+
+        if base is None:
+            base = self.matches @ weights
+        raw = base.reshape(P, -1) + self.offset
+
+        shown = self.eligible & (raw >= min_score)
+        rounded = np.round(raw, 2)
+        key = np.where(shown, rounded, -np.inf)
+
+        # stable sort keeps catalog order on ties, like sorted(reverse=True)
+        order = np.argsort(-key, axis=1, kind="stable")[:, :N]
+        top_scores = np.take_along_axis(rounded, order, axis=1)
+
+        qualified = shown.sum(axis=1)
+        kept = np.minimum(qualified, N)
+
+        slots = np.arange(N)[None, :]
+        from_scored = slots < kept[:, None]
+        filler_pos = np.clip(slots - kept[:, None], 0, N - 1)
+        filler_ids = np.take_along_axis(self.fillers, filler_pos, axis=1)
+
+        primary = np.where(from_scored, order, filler_ids)
+
+        confident = (from_scored & (top_scores >= CONFIDENCE_SCORE_CUT)).sum(axis=1)
+        shown_count = kept + np.minimum(N - kept, self.n_eligible)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confidence = np.round(confident / shown_count, 2)
+
+        return primary, qualified, confidence
+
+    def _candidate_rules(self, candidate: dict) -> dict:
+        validate_candidate(candidate)
+        return merge_rules(self.rules, candidate)
+
+    def evaluate(self, candidate: dict, base=None) -> dict:
+        rules = self._candidate_rules(candidate)
+        weights, min_score = self._weight_vector(rules)
+        primary, qualified, confidence = self._rank(weights, min_score, base)
+
+        base_primary = self.baseline[0]
+        answered = ~np.isnan(confidence)
+        conf = confidence[answered]
+
+        values, counts = np.unique(conf, return_counts=True)
+        top_card = primary[:, 0]
+        top_ids, top_counts = np.unique(top_card[top_card >= 0], return_counts=True)
+
+        return {
+            "candidate": candidate,
+            "ranking_change_rate": float((primary != base_primary).any(axis=1).mean()),
+            "top_card_churn": float((top_card != base_primary[:, 0]).mean()),
+            "fallback_rate": float((qualified < self.top_n).mean()),
+            "no_card_rate": float((~answered).mean()),
+            "confidence": {
+                "mean": float(conf.mean()) if conf.size else None,
+                "p10": float(np.percentile(conf, 10)) if conf.size else None,
+                "p50": float(np.percentile(conf, 50)) if conf.size else None,
+                "p90": float(np.percentile(conf, 90)) if conf.size else None,
+                "distribution": {
+                    str(float(v)): int(n) for v, n in zip(values, counts)
+                }
+            },
+            "top_card_share": {
+                str(self.card_ids[i]): round(n / self.n_profiles, 4)
+                for i, n in zip(top_ids, top_counts)
+            }
+        }
+
+    def run(self, candidates: list, batch_size: int = 8) -> list:
+        """
+        Scores candidates in batches: one (P*C, R) x (R, batch) product
+        per batch, then a vectorised re-rank per candidate.
+        """
+        reports = []
+
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            weights = np.stack([
+                self._weight_vector(self._candidate_rules(c))[0] for c in batch
+            ], axis=1)
+            base = self.matches @ weights
+
+            for k, candidate in enumerate(batch):
+                reports.append(self.evaluate(candidate, base[:, k]))
+
+        return reports
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline RULES_CONFIG weight sweep")
+    parser.add_argument("--log", required=True, help="Recorded profile log (glob allowed)")
+    parser.add_argument("--candidates", required=True, help="JSON list or grid of rule overrides")
+    parser.add_argument("--cards", default="cards_master.json")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, choices=sorted(TENANTS_CONFIG))
+    parser.add_argument("--any-version", action="store_true",
+                        help="Also replay records scored on an older catalog/rules fingerprint")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    with open(args.cards, "r", encoding="utf-8") as f:
+        store = CardStore(json.load(f), catalog_version(args.cards))
+    tenant = TenantRegistry(store, TENANTS_CONFIG, DEFAULT_TENANT).tenants[args.tenant]
+
+    profiles = load_profiles(
+        args.log, args.tenant, None if args.any_version else tenant.catalog_version
+    )
+    with open(args.candidates, "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+    try:
+        if isinstance(candidates, dict):
+            candidates = expand_grid(candidates)
+        for candidate in candidates:
+            validate_candidate(candidate)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not profiles:
+        parser.error(
+            f"no recorded profiles for tenant '{args.tenant}' "
+            f"(catalog_version {tenant.catalog_version}) in {args.log}"
+        )
+
+    print(
+        f"✅ Tenant {tenant.tenant_id}: {len(profiles)} profiles, "
+        f"{len(tenant)} cards, {len(candidates)} candidates"
+    )
+
+    try:
+        sweep = WeightSweep(profiles, tenant.cards, tenant.rules)
+    except ValueError as e:
+        parser.error(f"tenant '{args.tenant}': {e}")
+    reports = sweep.run(candidates, batch_size=args.batch_size)
+
+    output = json.dumps(reports, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()